@@ -4,26 +4,58 @@ Flask application with MySQL database integration
 Supports JWT authentication and comprehensive transaction management
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Blueprint, Flask, current_app, g, request, jsonify, send_file
 from flask_cors import CORS
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import DataError, Error, IntegrityError, PoolError, ProgrammingError, pooling
 import jwt
 import bcrypt
+import argparse
 from datetime import datetime, timedelta, date
 import json
 import csv
+import hashlib
+import hmac
 import io
+import math
 import os
-from functools import wraps
+import queue
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict, namedtuple
+from decimal import Decimal, InvalidOperation
+from functools import lru_cache, wraps
 import logging
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
+import pyarrow.parquet as pq
 
-app = Flask(__name__)
-CORS(app)
+api = Blueprint('api', __name__)
 
 # Configuration
-app.config['JWT_SECRET_KEY'] = 'your-secret-key-change-in-production'
-app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+DEFAULT_CONFIG = {
+    'JWT_SECRET_KEY': 'your-secret-key-change-in-production',
+    'JWT_ACCESS_TOKEN_EXPIRES': timedelta(hours=24),
+    # Admission control: token buckets per (user, endpoint class),
+    # refill rate in requests/second and burst size. A dashboard load or
+    # filter change sends two heavy analytics calls and up to six requests at once.
+    'ADMISSION_LIMITS': {
+        'read': {'rate': 20.0, 'burst': 40},
+        'heavy': {'rate': 2.0, 'burst': 20},
+        'write': {'rate': 5.0, 'burst': 20}
+    },
+    'DB_POOL_SIZE': 10,  # Connections per pool, per worker process
+    'DB_MAX_CONNECTIONS': 150,  # Connection budget per MySQL server (max_connections minus headroom)
+    'MAX_IN_FLIGHT': None,  # Global cap on requests holding a DB connection; defaults to DB_POOL_SIZE
+    'MAX_USER_IN_FLIGHT': 8,  # Per-user cap on concurrent requests
+    # Group commit: coalesce concurrent POST /api/transactions into one INSERT and COMMIT
+    'GROUP_COMMIT': False,
+    'GROUP_COMMIT_MAX_BATCH': 64,  # Inserts per commit
+    'GROUP_COMMIT_WINDOW_US': 2000,  # How long the writer waits for more inserts after the first
+    'GROUP_COMMIT_TIMEOUT': 30  # Seconds a request waits for its batch to commit
+}
 
 # Database configuration
 DB_CONFIG = {
@@ -33,18 +65,287 @@ DB_CONFIG = {
     'password': 'password'  # Change this in production
 }
 
+# Read replicas, e.g. {'host': 'replica-1', 'port': 3306, 'database': ..., 'user': ..., 'password': ...}
+# DB_REPLICA_HOSTS="host1:3306,host2:3307" adds replicas that share the primary's credentials
+DB_REPLICAS = [
+    dict(DB_CONFIG, host=host.partition(':')[0], port=int(host.partition(':')[2] or 3306))
+    for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host.strip()
+]
+
+READ_YOUR_WRITES_WINDOW = 10  # Seconds a user's reads stay on the primary after a write
+# Write responses carry the pin's expiry (server epoch seconds); clients echo it so
+# the pin holds on whichever worker serves their next read
+READ_YOUR_WRITES_HEADER = 'X-Primary-Until'
+MAX_REPLICA_LAG = 2  # Seconds of replication lag tolerated before a replica is skipped
+REPLICA_HEALTH_INTERVAL = 5  # Seconds between replica health/lag checks
+
+CATEGORY_CACHE_TTL = 60  # Seconds before another worker's category changes become visible
+CATEGORY_CACHE_MAX_USERS = 10000
+
+SYNC_PAGE_SIZE = 500  # Default rows per /api/sync/changes page
+SYNC_MAX_PAGE_SIZE = 2000
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'schema.sql')
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'migrations')
+
+# Columnar export/import configuration
+EXPORT_BATCH_SIZE = 10000  # Rows fetched from MySQL per record batch
+IMPORT_BATCH_SIZE = 10000  # Rows inserted per executemany round trip
+COLUMNAR_COMPRESSION = 'zstd'
+
+COLUMNAR_SCHEMA = pa.schema([
+    ('transaction_date', pa.date32()),
+    ('category_id', pa.int32()),
+    ('category', pa.string()),
+    ('description', pa.string()),
+    ('credited', pa.decimal128(15, 2)),
+    ('debited', pa.decimal128(15, 2)),
+    ('balance', pa.decimal128(15, 2)),
+    ('notes', pa.string()),
+    ('reference_number', pa.string())
+])
+
+COLUMNAR_MIMETYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file'
+}
+
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def get_db_connection():
-    """Create and return a database connection"""
+class DatabaseRouter:
+    """Routes read-only work to healthy replicas and everything else to the primary"""
+    
+    def __init__(self, primary_config, replica_configs, pool_size):
+        self.primary_config = primary_config
+        self.replica_configs = replica_configs
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self.pid = None
+        self.pools = {}
+        self.replica_state = {}
+        self.write_pins = {}
+        self.next_replica = 0
+    
+    def _reset_after_fork(self):
+        """Pools are per process; never share sockets inherited from a parent"""
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.lock = threading.Lock()
+            self.pools = {}
+            self.write_pins = {}
+            self.replica_state = {
+                index: {'healthy': True, 'lag': None, 'checked_at': 0.0}
+                for index in range(len(self.replica_configs))
+            }
+    
+    def _pool(self, name, config):
+        pool = self.pools.get(name)
+        if pool is None:
+            with self.lock:
+                pool = self.pools.get(name)
+                if pool is None:
+                    # No session reset on return, so prepared statements survive checkouts
+                    pool = self.pools[name] = pooling.MySQLConnectionPool(
+                        pool_name=name, pool_size=self.pool_size, pool_reset_session=False, **config
+                    )
+        return pool
+    
+    def _check_replica(self, connection, state):
+        """Refresh a replica's lag; a stopped replication thread marks it unhealthy"""
+        cursor = connection.cursor(dictionary=True)
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+            status = cursor.fetchone()
+        finally:
+            cursor.close()
+        
+        state['checked_at'] = time.monotonic()
+        if status is None:
+            # Standalone server standing in for a replica (e.g. local testing)
+            state['healthy'], state['lag'] = True, None
+            return
+        state['lag'] = status.get('Seconds_Behind_Source')
+        state['healthy'] = state['lag'] is not None and state['lag'] <= MAX_REPLICA_LAG
+    
+    def _replica_connection(self):
+        """Return a connection to the next healthy replica, or None"""
+        for _ in range(len(self.replica_configs)):
+            with self.lock:
+                index = self.next_replica
+                self.next_replica = (index + 1) % len(self.replica_configs)
+            state = self.replica_state[index]
+            due = time.monotonic() - state['checked_at'] >= REPLICA_HEALTH_INTERVAL
+            if not state['healthy'] and not due:
+                continue
+            
+            connection = None
+            try:
+                connection = self._pool(f'replica_{index}', self.replica_configs[index]).get_connection()
+                if due:
+                    self._check_replica(connection, state)
+                if state['healthy']:
+                    return connection
+                logger.warning(f"Replica {index} lagging ({state['lag']}s), skipping")
+            except Error as e:
+                state['healthy'], state['checked_at'] = False, time.monotonic()
+                logger.warning(f"Replica {index} unavailable: {e}")
+            if connection:
+                connection.close()
+        return None
+    
+    def connection(self, read_only=False, user_id=None):
+        """Return a pooled connection; writes pin the user to the primary for a while"""
+        self._reset_after_fork()
+        
+        if read_only and self.replica_configs:
+            if not self.is_pinned(user_id):
+                connection = self._replica_connection()
+                if connection:
+                    return connection
+        elif user_id is not None:
+            self.pin_to_primary(user_id)
+        
+        return self._pool('primary', self.primary_config).get_connection()
+    
+    def is_pinned(self, user_id):
+        self._reset_after_fork()
+        return self.write_pins.get(user_id, 0) > time.monotonic()
+    
+    def pin_to_primary(self, user_id):
+        """Keep the user's reads on the primary for READ_YOUR_WRITES_WINDOW seconds"""
+        self._reset_after_fork()
+        now = time.monotonic()
+        self.write_pins[user_id] = now + READ_YOUR_WRITES_WINDOW
+        if len(self.write_pins) > 10000:
+            self.write_pins = {uid: until for uid, until in self.write_pins.items() if until > now}
+    
+    def warm_up(self):
+        """Fill this process's pools up front instead of on the first requests"""
+        self._reset_after_fork()
+        self._pool('primary', self.primary_config)
+        for index, config in enumerate(self.replica_configs):
+            try:
+                self._pool(f'replica_{index}', config)
+            except Error as e:
+                self.replica_state[index].update(healthy=False, checked_at=time.monotonic())
+                logger.warning(f"Replica {index} unavailable during warm-up: {e}")
+    
+    def checkout_all(self):
+        """Check out every idle connection from every open pool (used during warm-up)"""
+        connections = []
+        for pool in list(self.pools.values()):
+            while True:
+                try:
+                    connections.append(pool.get_connection())
+                except PoolError:
+                    break
+        return connections
+    
+    def snapshot(self):
+        self._reset_after_fork()
+        return {
+            # Replicas by position in DB_REPLICAS; hosts are not exposed on this unauthenticated endpoint
+            'replicas': [
+                {'replica': index, 'healthy': state['healthy'], 'lag': state['lag']}
+                for index, state in enumerate(self.replica_state.values())
+            ],
+            'pinned_users': sum(1 for until in self.write_pins.values() if until > time.monotonic())
+        }
+
+class RequestConnection:
+    """A pooled connection checked out for one request; close() is idempotent"""
+    
+    def __init__(self, pooled):
+        self.pooled = pooled
+        self.closed = False
+    
+    def __getattr__(self, name):
+        return getattr(self.pooled, name)
+    
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            release_connection(self.pooled)
+
+def release_connection(pooled):
+    """Roll back and return a connection to its pool.
+    
+    Pools skip the session reset, and with autocommit off even a SELECT leaves a
+    transaction open; an idle connection would otherwise keep its read view
+    (stalling purge) and metadata locks that block migrations.
+    """
+    try:
+        if pooled.in_transaction:
+            pooled.rollback()
+    except Error as e:
+        logger.error(f"Rollback on release failed: {e}")
+    finally:
+        pooled.close()
+
+def sign_primary_until(user_id, until):
+    """HMAC binding a read-your-writes expiry to the user it was issued to"""
+    message = f"{user_id}:{until}".encode()
+    return hmac.new(current_app.config['JWT_SECRET_KEY'].encode(), message, hashlib.sha256).hexdigest()
+
+def mark_write(user_id):
+    """Pin the user to the primary in this worker and, via the response header, in every worker"""
+    current_app.extensions['db_router'].pin_to_primary(user_id)
+    g.primary_until = (user_id, f"{time.time() + READ_YOUR_WRITES_WINDOW:.3f}")
+
+def primary_requested(user_id):
+    """True while the client echoes an unexpired pin issued to this user by a recent write response"""
+    if user_id is None:
+        return False
+    until, _, signature = request.headers.get(READ_YOUR_WRITES_HEADER, '').partition(':')
+    # Unsigned or forged values would let a client keep its reads on the primary indefinitely
+    if not signature or not hmac.compare_digest(signature, sign_primary_until(user_id, until)):
+        return False
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        return time.time() < float(until)
+    except ValueError:
+        return False
+
+def is_pinned_to_primary(user_id):
+    """True while the user's recent write must be visible, via the signed header or this worker's pin"""
+    return primary_requested(user_id) or current_app.extensions['db_router'].is_pinned(user_id)
+
+@api.after_app_request
+def add_read_your_writes_header(response):
+    if 'primary_until' in g:
+        user_id, until = g.primary_until
+        response.headers[READ_YOUR_WRITES_HEADER] = f"{until}:{sign_primary_until(user_id, until)}"
+    return response
+
+def get_db_connection(read_only=False, user_id=None):
+    """Return a pooled database connection, routed to a replica for read-only work"""
+    if read_only and primary_requested(user_id):
+        read_only, user_id = False, None
+    elif not read_only and user_id is not None:
+        mark_write(user_id)
+    try:
+        pooled = current_app.extensions['db_router'].connection(read_only=read_only, user_id=user_id)
     except Error as e:
         logger.error(f"Database connection error: {e}")
         return None
+    connection = RequestConnection(pooled)
+    g.setdefault('db_connections', []).append(connection)
+    return connection
+
+@api.teardown_app_request
+def release_db_connections(error=None):
+    """Return connections an early exit or exception left checked out, discarding uncommitted work"""
+    for connection in g.pop('db_connections', []):
+        connection.close()
+
+def next_change_seq(cursor, user_id):
+    """Bump the user's change sequence for this write and return it.
+    
+    Locks the user row until commit, so sequence order matches commit order.
+    """
+    cursor.execute("UPDATE users SET change_seq = LAST_INSERT_ID(change_seq + 1) WHERE id = %s", (user_id,))
+    return cursor.lastrowid
 
 def create_response(success=True, data=None, message="", status_code=200):
     """Standardized API response format"""
@@ -67,7 +368,7 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+            data = jwt.decode(token, current_app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
             current_user_id = data['user_id']
         except jwt.ExpiredSignatureError:
             return create_response(False, message="Token has expired", status_code=401)
@@ -77,8 +378,553 @@ def token_required(f):
         return f(current_user_id, *args, **kwargs)
     return decorated
 
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+    
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+    
+    def try_take(self):
+        """Take one token; return seconds until one is available if the bucket is empty"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+    
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+class AdmissionController:
+    """Sheds load early instead of letting requests queue on MySQL"""
+    
+    MAX_TRACKED_BUCKETS = 10000
+    
+    def __init__(self, config):
+        self.config = config
+        self.lock = threading.Lock()
+        self.buckets = OrderedDict()  # Least recently used first
+        self.in_flight = 0
+        self.user_in_flight = {}
+        self.stats = {
+            endpoint_class: {'admitted': 0, 'rate_limited': 0, 'overloaded': 0}
+            for endpoint_class in config['ADMISSION_LIMITS']
+        }
+    
+    def _bucket(self, user_id, endpoint_class):
+        key = (user_id, endpoint_class)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            limits = self.config['ADMISSION_LIMITS'][endpoint_class]
+            bucket = self.buckets[key] = TokenBucket(limits['rate'], limits['burst'])
+            if len(self.buckets) > self.MAX_TRACKED_BUCKETS:
+                # The idlest bucket has usually refilled to burst by now
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket
+    
+    def admit(self, user_id, endpoint_class):
+        """Return (status_code, retry_after); status_code is None when admitted"""
+        with self.lock:
+            bucket = self._bucket(user_id, endpoint_class)
+            retry_after = bucket.try_take()
+            if retry_after:
+                self.stats[endpoint_class]['rate_limited'] += 1
+                return 429, retry_after
+            
+            user_in_flight = self.user_in_flight.get(user_id, 0)
+            if (self.in_flight >= self.config['MAX_IN_FLIGHT']
+                    or user_in_flight >= self.config['MAX_USER_IN_FLIGHT']):
+                bucket.refund()
+                self.stats[endpoint_class]['overloaded'] += 1
+                return 503, 1
+            
+            self.in_flight += 1
+            self.user_in_flight[user_id] = user_in_flight + 1
+            self.stats[endpoint_class]['admitted'] += 1
+            return None, 0
+    
+    def release(self, user_id):
+        with self.lock:
+            self.in_flight -= 1
+            remaining = self.user_in_flight[user_id] - 1
+            if remaining:
+                self.user_in_flight[user_id] = remaining
+            else:
+                del self.user_in_flight[user_id]
+    
+    def snapshot(self):
+        with self.lock:
+            return {
+                'in_flight': self.in_flight,
+                'max_in_flight': self.config['MAX_IN_FLIGHT'],
+                'classes': {name: dict(counts) for name, counts in self.stats.items()}
+            }
+
+def admission_control(endpoint_class):
+    """Per-user rate limiting and concurrency decorator; apply below token_required"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(current_user_id, *args, **kwargs):
+            admission_controller = current_app.extensions['admission_controller']
+            status_code, retry_after = admission_controller.admit(current_user_id, endpoint_class)
+            if status_code == 429:
+                response, status_code = create_response(False, message="Too many requests", status_code=429)
+                response.headers['Retry-After'] = str(math.ceil(retry_after))
+                return response, status_code
+            if status_code == 503:
+                response, status_code = create_response(False, message="Server is busy, please retry", status_code=503)
+                response.headers['Retry-After'] = str(retry_after)
+                return response, status_code
+            
+            try:
+                return f(current_user_id, *args, **kwargs)
+            finally:
+                admission_controller.release(current_user_id)
+        return decorated
+    return decorator
+
+# Transaction query compilation
+TransactionFilters = namedtuple('TransactionFilters', ['category_id', 'from_date', 'to_date'])
+
+# Optional filters in the order their placeholders appear in the compiled SQL
+FILTER_CLAUSES = (
+    ('category_id', " AND t.category_id = %s"),
+    ('from_date', " AND t.transaction_date >= %s"),
+    ('to_date', " AND t.transaction_date <= %s")
+)
+
+# Query kind -> (SELECT ... WHERE prefix, suffix appended after the filters)
+TRANSACTION_QUERIES = {
+    'list': ("""
+        SELECT t.*
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, " ORDER BY t.transaction_date DESC, t.created_at DESC LIMIT %s OFFSET %s"),
+    'count': ("""
+        SELECT COUNT(*) as total
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, ""),
+    'summary': ("""
+        SELECT 
+            SUM(t.credited) as total_credited,
+            SUM(t.debited) as total_debited,
+            (SUM(t.credited) - SUM(t.debited)) as net_amount,
+            COUNT(*) as total_transactions
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, ""),
+    'category_spending': ("""
+        SELECT 
+            t.category_id,
+            SUM(t.debited) as total_spent,
+            SUM(t.credited) as total_credited,
+            COUNT(t.id) as transaction_count
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, " GROUP BY t.category_id ORDER BY total_spent DESC"),
+    'export_csv': ("""
+        SELECT 
+            t.transaction_date,
+            t.category_id,
+            t.description,
+            t.credited,
+            t.debited,
+            t.balance,
+            t.notes
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, " ORDER BY t.transaction_date DESC"),
+    # Oldest first so that a restore replays balances in order
+    'export_columnar': ("""
+        SELECT 
+            t.transaction_date,
+            t.category_id,
+            t.description,
+            t.credited,
+            t.debited,
+            t.balance,
+            t.notes,
+            t.reference_number
+        FROM transactions t
+        WHERE t.user_id = %s AND t.is_active = TRUE
+        """, " ORDER BY t.transaction_date, t.id")
+}
+
+CURRENT_BALANCE_QUERY = """
+SELECT COALESCE(MAX(balance), 0) as current_balance
+FROM transactions
+WHERE user_id = %s AND is_active = TRUE
+"""
+
+def parse_transaction_filters(args, with_category=True):
+    """Validate and normalize category/date query parameters; raises ValueError"""
+    category_id = args.get('category_id') if with_category else None
+    if category_id in (None, '', 'all'):
+        category_id = None
+    else:
+        try:
+            category_id = int(category_id)
+        except ValueError:
+            raise ValueError("category_id must be an integer or 'all'")
+    
+    dates = {}
+    for name in ('from_date', 'to_date'):
+        value = args.get(name)
+        try:
+            dates[name] = date.fromisoformat(value) if value else None
+        except ValueError:
+            raise ValueError(f"{name} must be a date in YYYY-MM-DD format")
+    
+    return TransactionFilters(category_id, dates['from_date'], dates['to_date'])
+
+@lru_cache(maxsize=None)
+def _compile_transaction_query(kind, shape):
+    """SQL text for a query kind and filter shape; the same str object is returned per shape"""
+    prefix, suffix = TRANSACTION_QUERIES[kind]
+    clauses = ''.join(clause for (_, clause), present in zip(FILTER_CLAUSES, shape) if present)
+    return prefix + clauses + suffix
+
+def build_transaction_query(kind, user_id, filters, *extra_params):
+    """Return (sql, params) for a query kind with the given filters applied"""
+    values = [getattr(filters, name) for name, _ in FILTER_CLAUSES]
+    shape = tuple(value is not None for value in values)
+    params = [user_id] + [value for value in values if value is not None] + list(extra_params)
+    return _compile_transaction_query(kind, shape), params
+
+# Prepared cursors per raw connection, keyed by SQL text
+_prepared_cursors = weakref.WeakKeyDictionary()
+
+def execute_prepared(connection, sql, params=()):
+    """Run sql as a server-side prepared statement reused for the life of the pooled connection.
+    
+    Returns a dictionary cursor owned by the cache; fetch from it but do not close it.
+    """
+    if isinstance(connection, RequestConnection):
+        connection = connection.pooled
+    raw = getattr(connection, '_cnx', connection)  # Unwrap PooledMySQLConnection
+    cache = _prepared_cursors.get(raw)
+    if cache is None or cache['connection_id'] != raw.connection_id:
+        # New or reconnected session: server-side statements are gone
+        cache = _prepared_cursors[raw] = {'connection_id': raw.connection_id, 'cursors': {}}
+    
+    cursor = cache['cursors'].get(sql)
+    if cursor is None:
+        cursor = cache['cursors'][sql] = raw.cursor(prepared=True, dictionary=True)
+    cursor.execute(sql, params)
+    return cursor
+
+# Category cache
+CATEGORY_COLUMNS = "id, user_id, name, description, color, icon, created_at, updated_at, is_active"
+GLOBAL_CATEGORIES_QUERY = f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE user_id IS NULL"
+USER_CATEGORIES_QUERY = f"SELECT {CATEGORY_COLUMNS} FROM categories WHERE user_id = %s"
+
+class CategoryCache:
+    """Per-process id -> category dictionaries; global defaults are loaded once and shared.
+    
+    Inactive categories are kept so old transactions still resolve their name.
+    Writes in this process invalidate immediately; other workers pick up changes
+    within CATEGORY_CACHE_TTL seconds, or sooner when a lookup misses.
+    """
+    
+    def __init__(self, ttl=CATEGORY_CACHE_TTL, max_users=CATEGORY_CACHE_MAX_USERS):
+        self.ttl = ttl
+        self.max_users = max_users
+        self.lock = threading.Lock()
+        self.global_categories = None
+        self.user_categories = OrderedDict()
+    
+    def _load(self, connection, query, params):
+        rows = execute_prepared(connection, query, params).fetchall()
+        return time.monotonic(), {row['id']: row for row in rows}
+    
+    def _fresh(self, entry):
+        return entry is not None and time.monotonic() - entry[0] < self.ttl
+    
+    def get(self, connection, user_id, category_ids=(), refresh=False):
+        """Return {category_id: row} for every category visible to the user.
+        
+        The user's entry is reloaded once if any of category_ids is missing
+        (e.g. created in another worker), or unconditionally with refresh=True.
+        """
+        with self.lock:
+            global_entry = self.global_categories
+            user_entry = self.user_categories.get(user_id)
+        
+        if not self._fresh(global_entry):
+            global_entry = self._load(connection, GLOBAL_CATEGORIES_QUERY, ())
+        if refresh or not self._fresh(user_entry):
+            user_entry = self._load(connection, USER_CATEGORIES_QUERY, (user_id,))
+        elif any(category_id is not None and category_id not in user_entry[1]
+                 and category_id not in global_entry[1] for category_id in category_ids):
+            user_entry = self._load(connection, USER_CATEGORIES_QUERY, (user_id,))
+        
+        with self.lock:
+            self.global_categories = global_entry
+            self.user_categories[user_id] = user_entry
+            self.user_categories.move_to_end(user_id)
+            while len(self.user_categories) > self.max_users:
+                self.user_categories.popitem(last=False)
+        
+        categories = dict(global_entry[1])
+        categories.update(user_entry[1])
+        return categories
+    
+    def invalidate(self, user_id):
+        with self.lock:
+            self.user_categories.pop(user_id, None)
+
+def get_user_categories(connection, user_id, category_ids=(), refresh=False):
+    """Cached category lookup for the current app"""
+    return current_app.extensions['category_cache'].get(connection, user_id, category_ids, refresh)
+
+def attach_category(row, categories):
+    """Add category_name/color/icon to a transaction row in place of a categories JOIN"""
+    category = categories.get(row['category_id'])
+    row['category_name'] = category['name'] if category else None
+    row['category_color'] = category['color'] if category else None
+    row['category_icon'] = category['icon'] if category else None
+    return row
+
+# Delta sync queries
+USER_CHANGE_SEQ_QUERY = "SELECT change_seq FROM users WHERE id = %s"
+
+SYNC_TRANSACTIONS_QUERY = """
+SELECT * FROM transactions
+WHERE user_id = %s AND change_seq > %s AND change_seq <= %s
+ORDER BY change_seq, id
+LIMIT %s
+"""
+
+# Continuation inside a single change sequence that spans more than one page
+SYNC_TRANSACTIONS_AFTER_QUERY = """
+SELECT * FROM transactions
+WHERE user_id = %s AND (change_seq > %s OR (change_seq = %s AND id > %s)) AND change_seq <= %s
+ORDER BY change_seq, id
+LIMIT %s
+"""
+
+SYNC_CATEGORIES_QUERY = f"""
+SELECT {CATEGORY_COLUMNS}, change_seq FROM categories
+WHERE user_id = %s AND change_seq > %s AND change_seq <= %s
+ORDER BY change_seq, id
+"""
+
+def parse_sync_cursor(value):
+    """Parse 'seq' or 'seq:id' into (seq, id); no cursor means a full sync"""
+    if not value:
+        return -1, None
+    try:
+        seq, _, last_id = value.partition(':')
+        return int(seq), int(last_id) if last_id else None
+    except ValueError:
+        raise ValueError("since must be a cursor returned by a previous sync")
+
+# Group commit
+class PendingInsert:
+    """A queued transaction insert; the request thread waits on `done`.
+    
+    Moves from 'queued' to either 'claimed' (the writer took it into a batch)
+    or 'cancelled' (the request gave up first), never both.
+    """
+    
+    def __init__(self, user_id, values):
+        self.user_id = user_id
+        self.values = values
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+        self.state = 'queued'
+        self.transaction_id = None
+        self.balance = None
+        self.error = None
+    
+    def _transition(self, state):
+        with self.lock:
+            if self.state != 'queued':
+                return False
+            self.state = state
+            return True
+    
+    def claim(self):
+        return self._transition('claimed')
+    
+    def cancel(self):
+        return self._transition('cancelled')
+
+class GroupCommitWriter:
+    """Per-worker writer thread that turns concurrent inserts into one multi-row INSERT and one COMMIT.
+    
+    Balances are assigned per user in arrival order. Each user's change sequence
+    is bumped once per batch, which also maps the new rows back to their ids.
+    """
+    
+    INSERT_QUERY = """
+    INSERT INTO transactions (user_id, category_id, transaction_date, description, credited, debited, balance, notes, change_seq)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    BATCH_IDS_QUERY = "SELECT id FROM transactions WHERE user_id = %s AND change_seq = %s ORDER BY id"
+    # Errors caused by a row's data; anything else (lost connection, failed COMMIT) fails the whole batch
+    STATEMENT_ERRORS = (DataError, IntegrityError, ProgrammingError)
+    
+    def __init__(self, db_config, max_batch, window_us):
+        self.db_config = db_config
+        self.max_batch = max_batch
+        self.window = window_us / 1000000
+        self.pid = None
+        self.lock = threading.Lock()
+        self.stats = {'batches': 0, 'inserts': 0, 'fallbacks': 0}
+    
+    def _start(self):
+        """Threads do not survive fork; start one per worker process on first use"""
+        with self.lock:
+            if self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.queue = queue.Queue()
+                self.connection = None
+                threading.Thread(target=self._run, name='group-commit-writer', daemon=True).start()
+    
+    def submit(self, user_id, category_id, transaction_date, description, credited, debited, notes):
+        if self.pid != os.getpid():
+            self._start()
+        pending = PendingInsert(user_id, (
+            category_id, transaction_date, description, Decimal(str(credited)), Decimal(str(debited)), notes
+        ))
+        self.queue.put(pending)
+        return pending
+    
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            # Skip inserts whose request already timed out and answered 503
+            batch = [pending for pending in batch if pending.claim()]
+            if not batch:
+                continue
+            
+            try:
+                self._commit(batch)
+            except self.STATEMENT_ERRORS as e:
+                if len(batch) == 1:
+                    batch[0].error = e
+                else:
+                    # Retry one by one so a single bad row does not fail its neighbours
+                    logger.warning(f"Group commit of {len(batch)} inserts failed, retrying individually: {e}")
+                    self.stats['fallbacks'] += 1
+                    for pending in batch:
+                        try:
+                            self._commit([pending])
+                        except Error as single_error:
+                            pending.error = single_error
+            except Error as e:
+                # The batch may or may not have committed; do not replay it
+                logger.error(f"Group commit of {len(batch)} inserts failed: {e}")
+                self._discard_connection()
+                for pending in batch:
+                    pending.error = e
+            except Exception as e:
+                logger.error(f"Group commit writer error: {e}")
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
+    
+    def _connection(self):
+        """The writer keeps its own connection so it never competes for the request pool"""
+        if self.connection is None or not self.connection.is_connected():
+            self.connection = mysql.connector.connect(**self.db_config)
+        return self.connection
+    
+    def _discard_connection(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Error:
+                pass
+        self.connection = None
+    
+    def _commit(self, batch):
+        connection = self._connection()
+        cursor = connection.cursor()
+        try:
+            by_user = {}
+            for pending in batch:
+                by_user.setdefault(pending.user_id, []).append(pending)
+            
+            rows = []
+            change_seqs = {}
+            # Lock user rows in a fixed order
+            for user_id in sorted(by_user):
+                change_seqs[user_id] = change_seq = next_change_seq(cursor, user_id)
+                cursor.execute(CURRENT_BALANCE_QUERY, (user_id,))
+                balance = Decimal(cursor.fetchone()[0])
+                for pending in by_user[user_id]:
+                    category_id, transaction_date, description, credited, debited, notes = pending.values
+                    balance += credited - debited
+                    pending.balance = balance
+                    rows.append((
+                        user_id, category_id, transaction_date, description,
+                        credited, debited, balance, notes, change_seq
+                    ))
+            
+            # executemany rewrites this into a single multi-row INSERT
+            cursor.executemany(self.INSERT_QUERY, rows)
+            
+            for user_id, pending_inserts in by_user.items():
+                cursor.execute(self.BATCH_IDS_QUERY, (user_id, change_seqs[user_id]))
+                for pending, (transaction_id,) in zip(pending_inserts, cursor.fetchall()):
+                    pending.transaction_id = transaction_id
+            
+            connection.commit()
+            self.stats['batches'] += 1
+            self.stats['inserts'] += len(batch)
+        except Exception:
+            try:
+                connection.rollback()
+            except Error as e:
+                logger.error(f"Group commit rollback failed: {e}")
+            raise
+        finally:
+            cursor.close()
+    
+    def snapshot(self):
+        batches = self.stats['batches']
+        return dict(self.stats, average_batch=round(self.stats['inserts'] / batches, 2) if batches else 0)
+
+# Filter shapes the dashboard issues on first load: no filters and a date range
+WARMUP_FILTERS = (
+    TransactionFilters(None, None, None),
+    TransactionFilters(None, date.min, date.max)
+)
+
+def warm_prepared_statements(connection):
+    """Prepare the hottest statements on a pooled connection; user 0 owns no rows"""
+    for filters in WARMUP_FILTERS:
+        for kind in ('list', 'count', 'summary'):
+            extra_params = (1, 0) if kind == 'list' else ()
+            query, params = build_transaction_query(kind, 0, filters, *extra_params)
+            execute_prepared(connection, query, params).fetchall()
+    execute_prepared(connection, CURRENT_BALANCE_QUERY, (0,)).fetchall()
+    execute_prepared(connection, USER_CATEGORIES_QUERY, (0,)).fetchall()
+
 # Authentication Routes
-@app.route('/api/auth/register', methods=['POST'])
+@api.route('/api/auth/register', methods=['POST'])
 def register():
     """User registration"""
     try:
@@ -113,8 +959,8 @@ def register():
         token = jwt.encode({
             'user_id': user_id,
             'username': username,
-            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES']
-        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+            'exp': datetime.utcnow() + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+        }, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
         
         cursor.close()
         connection.close()
@@ -136,7 +982,7 @@ def register():
         logger.error(f"Registration error: {e}")
         return create_response(False, message="Registration failed", status_code=500)
 
-@app.route('/api/auth/login', methods=['POST'])
+@api.route('/api/auth/login', methods=['POST'])
 def login():
     """User login"""
     try:
@@ -163,8 +1009,8 @@ def login():
         token = jwt.encode({
             'user_id': user['id'],
             'username': user['username'],
-            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES']
-        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+            'exp': datetime.utcnow() + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+        }, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
         
         cursor.close()
         connection.close()
@@ -185,7 +1031,7 @@ def login():
         return create_response(False, message="Login failed", status_code=500)
 
 # Demo login for development
-@app.route('/api/auth/demo-login', methods=['POST'])
+@api.route('/api/auth/demo-login', methods=['POST'])
 def demo_login():
     """Demo login for development/testing"""
     try:
@@ -193,8 +1039,8 @@ def demo_login():
         token = jwt.encode({
             'user_id': 1,
             'username': 'demo_user',
-            'exp': datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES']
-        }, app.config['JWT_SECRET_KEY'], algorithm='HS256')
+            'exp': datetime.utcnow() + current_app.config['JWT_ACCESS_TOKEN_EXPIRES']
+        }, current_app.config['JWT_SECRET_KEY'], algorithm='HS256')
         
         return create_response(True, {
             'token': token,
@@ -212,35 +1058,35 @@ def demo_login():
         return create_response(False, message="Demo login failed", status_code=500)
 
 # Categories Routes
-@app.route('/api/categories', methods=['GET'])
+@api.route('/api/categories', methods=['GET'])
 @token_required
+@admission_control('read')
 def get_categories(current_user_id):
     """Get all active categories for the user"""
     try:
-        connection = get_db_connection()
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
-        cursor = connection.cursor(dictionary=True)
-        query = """
-        SELECT * FROM categories 
-        WHERE (user_id = %s OR user_id IS NULL) AND is_active = TRUE 
-        ORDER BY name
-        """
-        cursor.execute(query, (current_user_id,))
-        categories = cursor.fetchall()
-        
-        cursor.close()
+        # After a category write, which invalidated only that worker's cache, skip the cached entry
+        categories = get_user_categories(connection, current_user_id,
+                                         refresh=is_pinned_to_primary(current_user_id))
         connection.close()
         
-        return create_response(True, categories)
+        active_categories = sorted(
+            (category for category in categories.values() if category['is_active']),
+            key=lambda category: category['name']
+        )
+        
+        return create_response(True, active_categories)
         
     except Exception as e:
         logger.error(f"Get categories error: {e}")
         return create_response(False, message="Failed to fetch categories", status_code=500)
 
-@app.route('/api/categories', methods=['POST'])
+@api.route('/api/categories', methods=['POST'])
 @token_required
+@admission_control('write')
 def add_category(current_user_id):
     """Add a new category"""
     try:
@@ -253,17 +1099,19 @@ def add_category(current_user_id):
         if not name:
             return create_response(False, message="Category name is required", status_code=400)
         
-        connection = get_db_connection()
+        connection = get_db_connection(user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
         cursor = connection.cursor()
+        change_seq = next_change_seq(cursor, current_user_id)
         query = """
-        INSERT INTO categories (user_id, name, description, color, icon)
-        VALUES (%s, %s, %s, %s, %s)
+        INSERT INTO categories (user_id, name, description, color, icon, change_seq)
+        VALUES (%s, %s, %s, %s, %s, %s)
         """
-        cursor.execute(query, (current_user_id, name, description, color, icon))
+        cursor.execute(query, (current_user_id, name, description, color, icon, change_seq))
         connection.commit()
+        current_app.extensions['category_cache'].invalidate(current_user_id)
         
         category_id = cursor.lastrowid
         
@@ -276,23 +1124,27 @@ def add_category(current_user_id):
         logger.error(f"Add category error: {e}")
         return create_response(False, message="Failed to add category", status_code=500)
 
-@app.route('/api/categories/<int:category_id>', methods=['DELETE'])
+@api.route('/api/categories/<int:category_id>', methods=['DELETE'])
 @token_required
+@admission_control('write')
 def delete_category(current_user_id, category_id):
     """Soft delete a category"""
     try:
-        connection = get_db_connection()
+        connection = get_db_connection(user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
         cursor = connection.cursor()
-        query = "UPDATE categories SET is_active = FALSE WHERE id = %s AND user_id = %s"
-        cursor.execute(query, (category_id, current_user_id))
-        connection.commit()
+        change_seq = next_change_seq(cursor, current_user_id)
+        query = "UPDATE categories SET is_active = FALSE, change_seq = %s WHERE id = %s AND user_id = %s"
+        cursor.execute(query, (change_seq, category_id, current_user_id))
         
         if cursor.rowcount == 0:
             return create_response(False, message="Category not found", status_code=404)
         
+        connection.commit()
+        current_app.extensions['category_cache'].invalidate(current_user_id)
+        
         cursor.close()
         connection.close()
         
@@ -303,55 +1155,32 @@ def delete_category(current_user_id, category_id):
         return create_response(False, message="Failed to delete category", status_code=500)
 
 # Transactions Routes
-@app.route('/api/transactions', methods=['GET'])
+@api.route('/api/transactions', methods=['GET'])
 @token_required
+@admission_control('read')
 def get_transactions(current_user_id):
     """Get transactions with optional filtering"""
     try:
         # Get query parameters for filtering
-        category_id = request.args.get('category_id')
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
-        page = int(request.args.get('page', 1))
-        limit = int(request.args.get('limit', 50))
+        try:
+            filters = parse_transaction_filters(request.args)
+            page = int(request.args.get('page', 1))
+            limit = int(request.args.get('limit', 50))
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
         
-        connection = get_db_connection()
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
-        cursor = connection.cursor(dictionary=True)
-        
-        # Base query
-        query = """
-        SELECT t.*, c.name as category_name, c.color as category_color, c.icon as category_icon
-        FROM transactions t
-        LEFT JOIN categories c ON t.category_id = c.id
-        WHERE t.user_id = %s AND t.is_active = TRUE
-        """
-        params = [current_user_id]
-        
-        # Add filters
-        if category_id and category_id != 'all':
-            query += " AND t.category_id = %s"
-            params.append(category_id)
-        
-        if from_date:
-            query += " AND t.transaction_date >= %s"
-            params.append(from_date)
-        
-        if to_date:
-            query += " AND t.transaction_date <= %s"
-            params.append(to_date)
-        
-        query += " ORDER BY t.transaction_date DESC, t.created_at DESC"
-        query += " LIMIT %s OFFSET %s"
-        params.extend([limit, (page - 1) * limit])
-        
-        cursor.execute(query, params)
-        transactions = cursor.fetchall()
+        query, params = build_transaction_query('list', current_user_id, filters, limit, (page - 1) * limit)
+        transactions = execute_prepared(connection, query, params).fetchall()
+        categories = get_user_categories(connection, current_user_id,
+                                         {transaction['category_id'] for transaction in transactions})
         
         # Convert decimal values to float for JSON serialization
         for transaction in transactions:
+            attach_category(transaction, categories)
             transaction['credited'] = float(transaction['credited'])
             transaction['debited'] = float(transaction['debited'])
             transaction['balance'] = float(transaction['balance'])
@@ -359,29 +1188,9 @@ def get_transactions(current_user_id):
                 transaction['transaction_date'] = transaction['transaction_date'].isoformat()
         
         # Get total count for pagination
-        count_query = """
-        SELECT COUNT(*) as total
-        FROM transactions t
-        WHERE t.user_id = %s AND t.is_active = TRUE
-        """
-        count_params = [current_user_id]
-        
-        if category_id and category_id != 'all':
-            count_query += " AND t.category_id = %s"
-            count_params.append(category_id)
-        
-        if from_date:
-            count_query += " AND t.transaction_date >= %s"
-            count_params.append(from_date)
+        count_query, count_params = build_transaction_query('count', current_user_id, filters)
+        total_count = execute_prepared(connection, count_query, count_params).fetchone()['total']
         
-        if to_date:
-            count_query += " AND t.transaction_date <= %s"
-            count_params.append(to_date)
-        
-        cursor.execute(count_query, count_params)
-        total_count = cursor.fetchone()['total']
-        
-        cursor.close()
         connection.close()
         
         return create_response(True, {
@@ -398,8 +1207,9 @@ def get_transactions(current_user_id):
         logger.error(f"Get transactions error: {e}")
         return create_response(False, message="Failed to fetch transactions", status_code=500)
 
-@app.route('/api/transactions', methods=['POST'])
+@api.route('/api/transactions', methods=['POST'])
 @token_required
+@admission_control('write')
 def add_transaction(current_user_id):
     """Add a new transaction"""
     try:
@@ -417,31 +1227,29 @@ def add_transaction(current_user_id):
         if credited == 0 and debited == 0:
             return create_response(False, message="Either credited or debited amount must be greater than 0", status_code=400)
         
-        connection = get_db_connection()
+        if current_app.config['GROUP_COMMIT']:
+            return add_transaction_grouped(current_user_id, category_id, transaction_date, description, credited, debited, notes)
+        
+        connection = get_db_connection(user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
         cursor = connection.cursor(dictionary=True)
+        change_seq = next_change_seq(cursor, current_user_id)
         
         # Calculate new balance
-        balance_query = """
-        SELECT COALESCE(MAX(balance), 0) as current_balance
-        FROM transactions
-        WHERE user_id = %s AND is_active = TRUE
-        """
-        cursor.execute(balance_query, (current_user_id,))
-        result = cursor.fetchone()
+        result = execute_prepared(connection, CURRENT_BALANCE_QUERY, (current_user_id,)).fetchone()
         current_balance = float(result['current_balance'])
         new_balance = current_balance + credited - debited
         
         # Insert transaction
         insert_query = """
-        INSERT INTO transactions (user_id, category_id, transaction_date, description, credited, debited, balance, notes)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        INSERT INTO transactions (user_id, category_id, transaction_date, description, credited, debited, balance, notes, change_seq)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
         cursor.execute(insert_query, (
             current_user_id, category_id, transaction_date, description, 
-            credited, debited, new_balance, notes
+            credited, debited, new_balance, notes, change_seq
         ))
         connection.commit()
         
@@ -456,8 +1264,33 @@ def add_transaction(current_user_id):
         logger.error(f"Add transaction error: {e}")
         return create_response(False, message="Failed to add transaction", status_code=500)
 
-@app.route('/api/transactions/<int:transaction_id>', methods=['PUT'])
+def add_transaction_grouped(current_user_id, category_id, transaction_date, description, credited, debited, notes):
+    """Queue the insert on this worker's group-commit writer and wait for its batch"""
+    mark_write(current_user_id)
+    pending = current_app.extensions['group_commit_writer'].submit(
+        current_user_id, category_id, transaction_date, description, credited, debited, notes
+    )
+    
+    if not pending.done.wait(current_app.config['GROUP_COMMIT_TIMEOUT']):
+        if pending.cancel():
+            # Never reached the writer, so a retry cannot create a duplicate
+            logger.error(f"Group commit timed out for user {current_user_id}")
+            return create_response(False, message="Transaction was not saved, please retry", status_code=503)
+        # Already part of a batch; its outcome is about to be known
+        pending.done.wait()
+    
+    if pending.error:
+        logger.error(f"Add transaction error: {pending.error}")
+        return create_response(False, message="Failed to add transaction", status_code=500)
+    
+    return create_response(True, {
+        'id': pending.transaction_id,
+        'balance': float(pending.balance)
+    }, "Transaction added successfully")
+
+@api.route('/api/transactions/<int:transaction_id>', methods=['PUT'])
 @token_required
+@admission_control('write')
 def update_transaction(current_user_id, transaction_id):
     """Update an existing transaction"""
     try:
@@ -469,7 +1302,7 @@ def update_transaction(current_user_id, transaction_id):
         debited = float(data.get('debited', 0))
         notes = data.get('notes', '')
         
-        connection = get_db_connection()
+        connection = get_db_connection(user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
@@ -477,7 +1310,7 @@ def update_transaction(current_user_id, transaction_id):
         
         # Get old transaction to calculate balance difference
         cursor.execute("""
-        SELECT credited, debited FROM transactions 
+        SELECT credited, debited, created_at FROM transactions 
         WHERE id = %s AND user_id = %s AND is_active = TRUE
         """, (transaction_id, current_user_id))
         
@@ -485,29 +1318,28 @@ def update_transaction(current_user_id, transaction_id):
         if not old_transaction:
             return create_response(False, message="Transaction not found", status_code=404)
         
-        old_credited, old_debited = old_transaction
+        old_credited, old_debited, created_at = old_transaction
         balance_diff = (credited - float(old_credited)) - (debited - float(old_debited))
+        change_seq = next_change_seq(cursor, current_user_id)
         
         # Update transaction
         update_query = """
         UPDATE transactions 
         SET category_id = %s, transaction_date = %s, description = %s, 
-            credited = %s, debited = %s, notes = %s, updated_at = CURRENT_TIMESTAMP
+            credited = %s, debited = %s, notes = %s, change_seq = %s, updated_at = CURRENT_TIMESTAMP
         WHERE id = %s AND user_id = %s AND is_active = TRUE
         """
         cursor.execute(update_query, (
-            category_id, transaction_date, description, credited, debited, notes,
+            category_id, transaction_date, description, credited, debited, notes, change_seq,
             transaction_id, current_user_id
         ))
         
         # Update balance for this and all subsequent transactions
         cursor.execute("""
         UPDATE transactions 
-        SET balance = balance + %s 
-        WHERE user_id = %s AND created_at >= (
-            SELECT created_at FROM transactions WHERE id = %s
-        ) AND is_active = TRUE
-        """, (balance_diff, current_user_id, transaction_id))
+        SET balance = balance + %s, change_seq = %s
+        WHERE user_id = %s AND created_at >= %s AND is_active = TRUE
+        """, (balance_diff, change_seq, current_user_id, created_at))
         
         connection.commit()
         cursor.close()
@@ -519,12 +1351,13 @@ def update_transaction(current_user_id, transaction_id):
         logger.error(f"Update transaction error: {e}")
         return create_response(False, message="Failed to update transaction", status_code=500)
 
-@app.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
+@api.route('/api/transactions/<int:transaction_id>', methods=['DELETE'])
 @token_required
+@admission_control('write')
 def delete_transaction(current_user_id, transaction_id):
     """Soft delete a transaction"""
     try:
-        connection = get_db_connection()
+        connection = get_db_connection(user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
@@ -542,20 +1375,21 @@ def delete_transaction(current_user_id, transaction_id):
         
         credited, debited, created_at = transaction
         balance_diff = float(debited) - float(credited)  # Reverse the transaction
+        change_seq = next_change_seq(cursor, current_user_id)
         
         # Soft delete transaction
         cursor.execute("""
         UPDATE transactions 
-        SET is_active = FALSE, updated_at = CURRENT_TIMESTAMP
+        SET is_active = FALSE, change_seq = %s, updated_at = CURRENT_TIMESTAMP
         WHERE id = %s AND user_id = %s
-        """, (transaction_id, current_user_id))
+        """, (change_seq, transaction_id, current_user_id))
         
         # Update balance for all subsequent transactions
         cursor.execute("""
         UPDATE transactions 
-        SET balance = balance + %s 
+        SET balance = balance + %s, change_seq = %s
         WHERE user_id = %s AND created_at > %s AND is_active = TRUE
-        """, (balance_diff, current_user_id, created_at))
+        """, (balance_diff, change_seq, current_user_id, created_at))
         
         connection.commit()
         cursor.close()
@@ -567,56 +1401,115 @@ def delete_transaction(current_user_id, transaction_id):
         logger.error(f"Delete transaction error: {e}")
         return create_response(False, message="Failed to delete transaction", status_code=500)
 
-# Summary and Analytics Routes
-@app.route('/api/transactions/summary', methods=['GET'])
+# Sync Routes
+@api.route('/api/sync/changes', methods=['GET'])
 @token_required
-def get_transaction_summary(current_user_id):
-    """Get transaction summary (total credited, debited, balance)"""
+@admission_control('read')
+def get_sync_changes(current_user_id):
+    """Transactions and categories changed since a sync cursor"""
     try:
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
-        category_id = request.args.get('category_id')
-        
-        connection = get_db_connection()
+        try:
+            since_seq, since_id = parse_sync_cursor(request.args.get('since'))
+            limit = min(int(request.args.get('limit', SYNC_PAGE_SIZE)), SYNC_MAX_PAGE_SIZE)
+            if limit < 1:
+                raise ValueError("limit must be a positive integer")
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
+        
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
-        cursor = connection.cursor(dictionary=True)
+        user = execute_prepared(connection, USER_CHANGE_SEQ_QUERY, (current_user_id,)).fetchone()
+        current_seq = user['change_seq'] if user else 0
         
-        query = """
-        SELECT 
-            SUM(credited) as total_credited,
-            SUM(debited) as total_debited,
-            (SUM(credited) - SUM(debited)) as net_amount,
-            COUNT(*) as total_transactions
-        FROM transactions 
-        WHERE user_id = %s AND is_active = TRUE
-        """
-        params = [current_user_id]
+        changes = {
+            'transactions': [],
+            'deleted_transaction_ids': [],
+            'categories': [],
+            'deleted_category_ids': [],
+            'next_cursor': str(current_seq),
+            'has_more': False
+        }
         
-        if category_id and category_id != 'all':
-            query += " AND category_id = %s"
-            params.append(category_id)
+        # Already in sync (a single primary key lookup), or served by a replica that has not
+        # caught up with the cursor yet: echo the cursor, keeping any ':id' part, so the rest
+        # of a partly read sequence is not skipped
+        if since_seq > current_seq or (since_id is None and since_seq == current_seq):
+            changes['next_cursor'] = str(since_seq) if since_id is None else f"{since_seq}:{since_id}"
+            connection.close()
+            return create_response(True, changes)
+        
+        if since_id is None:
+            rows = execute_prepared(connection, SYNC_TRANSACTIONS_QUERY, (
+                current_user_id, since_seq, current_seq, limit + 1
+            )).fetchall()
+        else:
+            rows = execute_prepared(connection, SYNC_TRANSACTIONS_AFTER_QUERY, (
+                current_user_id, since_seq, since_seq, since_id, current_seq, limit + 1
+            )).fetchall()
+        
+        window_end = current_seq
+        if len(rows) > limit:
+            rows = rows[:limit]
+            window_end = rows[-1]['change_seq']
+            changes['next_cursor'] = f"{window_end}:{rows[-1]['id']}"
+            changes['has_more'] = True
+        
+        # A write touches either categories or transactions, never both, so
+        # category changes are returned for the sequence window this page covers
+        categories = execute_prepared(connection, SYNC_CATEGORIES_QUERY, (
+            current_user_id, since_seq, window_end
+        )).fetchall()
+        if since_seq < 0:
+            categories = execute_prepared(connection, GLOBAL_CATEGORIES_QUERY, ()).fetchall() + categories
         
-        if from_date:
-            query += " AND transaction_date >= %s"
-            params.append(from_date)
+        connection.close()
         
-        if to_date:
-            query += " AND transaction_date <= %s"
-            params.append(to_date)
+        for transaction in rows:
+            if not transaction['is_active']:
+                changes['deleted_transaction_ids'].append(transaction['id'])
+                continue
+            transaction['credited'] = float(transaction['credited'])
+            transaction['debited'] = float(transaction['debited'])
+            transaction['balance'] = float(transaction['balance'])
+            if transaction['transaction_date']:
+                transaction['transaction_date'] = transaction['transaction_date'].isoformat()
+            changes['transactions'].append(transaction)
         
-        cursor.execute(query, params)
-        summary = cursor.fetchone()
+        for category in categories:
+            if category['is_active']:
+                changes['categories'].append(category)
+            else:
+                changes['deleted_category_ids'].append(category['id'])
+        
+        return create_response(True, changes)
+        
+    except Exception as e:
+        logger.error(f"Sync changes error: {e}")
+        return create_response(False, message="Failed to fetch changes", status_code=500)
+
+# Summary and Analytics Routes
+@api.route('/api/transactions/summary', methods=['GET'])
+@token_required
+@admission_control('read')
+def get_transaction_summary(current_user_id):
+    """Get transaction summary (total credited, debited, balance)"""
+    try:
+        try:
+            filters = parse_transaction_filters(request.args)
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
+        
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
+        if not connection:
+            return create_response(False, message="Database connection failed", status_code=500)
+        
+        query, params = build_transaction_query('summary', current_user_id, filters)
+        summary = execute_prepared(connection, query, params).fetchone()
         
         # Get current balance
-        balance_query = """
-        SELECT COALESCE(MAX(balance), 0) as current_balance
-        FROM transactions
-        WHERE user_id = %s AND is_active = TRUE
-        """
-        cursor.execute(balance_query, (current_user_id,))
-        balance_result = cursor.fetchone()
+        balance_result = execute_prepared(connection, CURRENT_BALANCE_QUERY, (current_user_id,)).fetchone()
         
         # Convert to float and handle None values
         summary_data = {
@@ -627,7 +1520,6 @@ def get_transaction_summary(current_user_id):
             'current_balance': float(balance_result['current_balance'] or 0)
         }
         
-        cursor.close()
         connection.close()
         
         return create_response(True, summary_data)
@@ -636,52 +1528,34 @@ def get_transaction_summary(current_user_id):
         logger.error(f"Get summary error: {e}")
         return create_response(False, message="Failed to fetch summary", status_code=500)
 
-@app.route('/api/analytics/category-spending', methods=['GET'])
+@api.route('/api/analytics/category-spending', methods=['GET'])
 @token_required
+@admission_control('heavy')
 def get_category_spending(current_user_id):
     """Get spending by category for charts"""
     try:
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
+        try:
+            filters = parse_transaction_filters(request.args, with_category=False)
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
         
-        connection = get_db_connection()
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
-        cursor = connection.cursor(dictionary=True)
-        
-        query = """
-        SELECT 
-            c.name as category_name,
-            c.color as category_color,
-            SUM(t.debited) as total_spent,
-            SUM(t.credited) as total_credited,
-            COUNT(t.id) as transaction_count
-        FROM transactions t
-        LEFT JOIN categories c ON t.category_id = c.id
-        WHERE t.user_id = %s AND t.is_active = TRUE
-        """
-        params = [current_user_id]
-        
-        if from_date:
-            query += " AND t.transaction_date >= %s"
-            params.append(from_date)
-        
-        if to_date:
-            query += " AND t.transaction_date <= %s"
-            params.append(to_date)
-        
-        query += " GROUP BY t.category_id, c.name, c.color ORDER BY total_spent DESC"
-        
-        cursor.execute(query, params)
-        category_data = cursor.fetchall()
+        query, params = build_transaction_query('category_spending', current_user_id, filters)
+        category_data = execute_prepared(connection, query, params).fetchall()
+        categories = get_user_categories(connection, current_user_id,
+                                         {item['category_id'] for item in category_data})
         
         # Convert decimal to float
         for item in category_data:
+            category = categories.get(item.pop('category_id'))
+            item['category_name'] = category['name'] if category else None
+            item['category_color'] = category['color'] if category else None
             item['total_spent'] = float(item['total_spent'] or 0)
             item['total_credited'] = float(item['total_credited'] or 0)
         
-        cursor.close()
         connection.close()
         
         return create_response(True, category_data)
@@ -690,12 +1564,13 @@ def get_category_spending(current_user_id):
         logger.error(f"Get category spending error: {e}")
         return create_response(False, message="Failed to fetch category spending", status_code=500)
 
-@app.route('/api/analytics/monthly-trends', methods=['GET'])
+@api.route('/api/analytics/monthly-trends', methods=['GET'])
 @token_required
+@admission_control('heavy')
 def get_monthly_trends(current_user_id):
     """Get monthly spending trends"""
     try:
-        connection = get_db_connection()
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
@@ -732,53 +1607,26 @@ def get_monthly_trends(current_user_id):
         return create_response(False, message="Failed to fetch monthly trends", status_code=500)
 
 # Export Routes
-@app.route('/api/export/csv', methods=['GET'])
+@api.route('/api/export/csv', methods=['GET'])
 @token_required
+@admission_control('heavy')
 def export_transactions_csv(current_user_id):
     """Export transactions as CSV"""
     try:
         # Get same filters as transactions endpoint
-        category_id = request.args.get('category_id')
-        from_date = request.args.get('from_date')
-        to_date = request.args.get('to_date')
+        try:
+            filters = parse_transaction_filters(request.args)
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
         
-        connection = get_db_connection()
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
         if not connection:
             return create_response(False, message="Database connection failed", status_code=500)
         
-        cursor = connection.cursor(dictionary=True)
-        
-        query = """
-        SELECT 
-            t.transaction_date,
-            c.name as category,
-            t.description,
-            t.credited,
-            t.debited,
-            t.balance,
-            t.notes
-        FROM transactions t
-        LEFT JOIN categories c ON t.category_id = c.id
-        WHERE t.user_id = %s AND t.is_active = TRUE
-        """
-        params = [current_user_id]
-        
-        if category_id and category_id != 'all':
-            query += " AND t.category_id = %s"
-            params.append(category_id)
-        
-        if from_date:
-            query += " AND t.transaction_date >= %s"
-            params.append(from_date)
-        
-        if to_date:
-            query += " AND t.transaction_date <= %s"
-            params.append(to_date)
-        
-        query += " ORDER BY t.transaction_date DESC"
-        
-        cursor.execute(query, params)
-        transactions = cursor.fetchall()
+        query, params = build_transaction_query('export_csv', current_user_id, filters)
+        transactions = execute_prepared(connection, query, params).fetchall()
+        categories = get_user_categories(connection, current_user_id,
+                                         {transaction['category_id'] for transaction in transactions})
         
         # Create CSV
         output = io.StringIO()
@@ -789,9 +1637,10 @@ def export_transactions_csv(current_user_id):
         
         # Write data
         for transaction in transactions:
+            category = categories.get(transaction['category_id'])
             writer.writerow([
                 transaction['transaction_date'],
-                transaction['category'] or 'Uncategorized',
+                category['name'] if category else 'Uncategorized',
                 transaction['description'],
                 float(transaction['credited']),
                 float(transaction['debited']),
@@ -803,7 +1652,6 @@ def export_transactions_csv(current_user_id):
         output.seek(0)
         csv_data = output.getvalue()
         
-        cursor.close()
         connection.close()
         
         # Return CSV file
@@ -816,34 +1664,414 @@ def export_transactions_csv(current_user_id):
         logger.error(f"Export CSV error: {e}")
         return create_response(False, message="Failed to export CSV", status_code=500)
 
+def _open_columnar_writer(path, file_format):
+    """Open a compressed Parquet or Arrow IPC writer for the export schema"""
+    if file_format == 'parquet':
+        return pq.ParquetWriter(path, COLUMNAR_SCHEMA, compression=COLUMNAR_COMPRESSION)
+    options = pa_ipc.IpcWriteOptions(compression=COLUMNAR_COMPRESSION)
+    return pa_ipc.new_file(path, COLUMNAR_SCHEMA, options=options)
+
+def _rows_to_record_batch(rows):
+    """Transpose a list of row tuples into an Arrow record batch"""
+    columns = list(zip(*rows))
+    arrays = [pa.array(column, type=field.type) for column, field in zip(columns, COLUMNAR_SCHEMA)]
+    return pa.RecordBatch.from_arrays(arrays, schema=COLUMNAR_SCHEMA)
+
+def _read_columnar_batches(stream, file_format):
+    """Return the schema of an uploaded file and an iterator over its record batches"""
+    if file_format == 'parquet':
+        parquet_file = pq.ParquetFile(stream)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=IMPORT_BATCH_SIZE)
+    reader = pa_ipc.open_file(stream)
+    return reader.schema, (reader.get_batch(i) for i in range(reader.num_record_batches))
+
+@api.route('/api/export/<any(parquet, arrow):file_format>', methods=['GET'])
+@token_required
+@admission_control('heavy')
+def export_transactions_columnar(current_user_id, file_format):
+    """Export transactions as a compressed Parquet or Arrow IPC file"""
+    try:
+        # Get same filters as transactions endpoint
+        try:
+            filters = parse_transaction_filters(request.args)
+        except ValueError as e:
+            return create_response(False, message=str(e), status_code=400)
+        
+        connection = get_db_connection(read_only=True, user_id=current_user_id)
+        if not connection:
+            return create_response(False, message="Database connection failed", status_code=500)
+        
+        # Resolve names before streaming; the unbuffered cursor holds the connection,
+        # so the ids are not known yet and the user's categories are always reloaded
+        category_names = {
+            category_id: category['name']
+            for category_id, category in get_user_categories(connection, current_user_id, refresh=True).items()
+        }
+        
+        # Unbuffered cursor so rows are streamed from the server in batches
+        cursor = connection.cursor()
+        query, params = build_transaction_query('export_columnar', current_user_id, filters)
+        cursor.execute(query, params)
+        
+        fd, path = tempfile.mkstemp(suffix=f'.{file_format}')
+        os.close(fd)
+        
+        row_count = 0
+        try:
+            writer = _open_columnar_writer(path, file_format)
+            try:
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    rows = [row[:2] + (category_names.get(row[1]),) + row[2:] for row in rows]
+                    writer.write_batch(_rows_to_record_batch(rows))
+                    row_count += len(rows)
+            finally:
+                writer.close()
+        except Exception:
+            # Never leave a partial export behind in the temp directory
+            os.remove(path)
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+        
+        logger.info(f"Exported {row_count} transactions as {file_format} for user {current_user_id}")
+        
+        response = send_file(
+            path,
+            mimetype=COLUMNAR_MIMETYPES[file_format],
+            as_attachment=True,
+            download_name=f'transactions_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{file_format}'
+        )
+        response.call_on_close(lambda: os.remove(path))
+        return response
+        
+    except Exception as e:
+        logger.error(f"Export {file_format} error: {e}")
+        return create_response(False, message=f"Failed to export {file_format}", status_code=500)
+
+# Import Routes
+@api.route('/api/import/<any(parquet, arrow):file_format>', methods=['POST'])
+@token_required
+@admission_control('heavy')
+def import_transactions_columnar(current_user_id, file_format):
+    """Bulk-load transactions from a Parquet or Arrow IPC export"""
+    try:
+        upload = request.files.get('file')
+        balance_mode = request.form.get('balance_mode', 'recompute')
+        
+        if not upload:
+            return create_response(False, message="File is required", status_code=400)
+        
+        if balance_mode not in ('keep', 'recompute'):
+            return create_response(False, message="balance_mode must be 'keep' or 'recompute'", status_code=400)
+        
+        try:
+            schema, batches = _read_columnar_batches(upload.stream, file_format)
+        except pa.ArrowException as e:
+            return create_response(False, message=f"Invalid {file_format} file: {e}", status_code=400)
+        
+        required_columns = ['transaction_date', 'description', 'credited', 'debited']
+        if balance_mode == 'keep':
+            required_columns.append('balance')
+        missing_columns = [name for name in required_columns if name not in schema.names]
+        if missing_columns:
+            return create_response(False, message=f"Missing columns: {', '.join(missing_columns)}", status_code=400)
+        
+        connection = get_db_connection(user_id=current_user_id)
+        if not connection:
+            return create_response(False, message="Database connection failed", status_code=500)
+        
+        cursor = connection.cursor()
+        change_seq = next_change_seq(cursor, current_user_id)
+        
+        # Only keep category references the user can see, including ones created in other workers
+        categories = get_user_categories(connection, current_user_id, refresh=True)
+        # Ids differ between databases and accounts, so fall back to the exported name;
+        # active and user-owned categories win over inactive and global ones
+        category_ids_by_name = {
+            category['name'].lower(): category_id
+            for category_id, category in sorted(
+                categories.items(),
+                key=lambda item: (bool(item[1]['is_active']), item[1]['user_id'] is not None)
+            )
+        }
+        
+        running_balance = Decimal('0')
+        if balance_mode == 'recompute':
+            cursor.execute(CURRENT_BALANCE_QUERY, (current_user_id,))
+            running_balance = Decimal(cursor.fetchone()[0])
+        
+        insert_query = """
+        INSERT INTO transactions (user_id, category_id, transaction_date, description, credited, debited, balance, notes, reference_number, change_seq)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        
+        imported = 0
+        try:
+            for batch in batches:
+                columns = {name: batch.column(name).to_pylist() for name in batch.schema.names}
+                empty_column = [None] * batch.num_rows
+                rows = []
+                for i in range(batch.num_rows):
+                    transaction_date = columns['transaction_date'][i]
+                    description = columns['description'][i]
+                    if not transaction_date or not description:
+                        raise ValueError(f"row {imported + i + 1} is missing a date or description")
+                    
+                    credited = Decimal(columns['credited'][i] or 0)
+                    debited = Decimal(columns['debited'][i] or 0)
+                    if balance_mode == 'recompute':
+                        running_balance += credited - debited
+                        balance = running_balance
+                    else:
+                        balance = Decimal(columns['balance'][i] or 0)
+                    
+                    category_id = columns.get('category_id', empty_column)[i]
+                    if category_id not in categories:
+                        category_name = columns.get('category', empty_column)[i]
+                        category_id = category_ids_by_name.get(category_name.lower()) if category_name else None
+                    
+                    rows.append((
+                        current_user_id, category_id, transaction_date, description,
+                        credited, debited, balance,
+                        columns.get('notes', empty_column)[i] or '',
+                        columns.get('reference_number', empty_column)[i],
+                        change_seq
+                    ))
+                
+                # executemany rewrites this into a single multi-row INSERT
+                cursor.executemany(insert_query, rows)
+                imported += len(rows)
+        except (ValueError, InvalidOperation, pa.ArrowException, DataError) as e:
+            # Bad values, a corrupt record batch / row group further into the file,
+            # or values MySQL rejects (e.g. a description longer than the column)
+            connection.rollback()
+            cursor.close()
+            connection.close()
+            return create_response(False, message=f"Invalid {file_format} file: {e}", status_code=400)
+        
+        connection.commit()
+        cursor.close()
+        connection.close()
+        
+        logger.info(f"Imported {imported} transactions from {file_format} for user {current_user_id}")
+        
+        return create_response(True, {'imported': imported}, "Transactions imported successfully")
+        
+    except Exception as e:
+        logger.error(f"Import {file_format} error: {e}")
+        return create_response(False, message=f"Failed to import {file_format}", status_code=500)
+
 # Health check endpoint
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return create_response(True, {'status': 'healthy'}, "API is running")
 
+@api.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe; 503 until this worker has opened its DB pools and warmed up"""
+    worker_state = current_app.extensions['worker_state']
+    if worker_state['error']:
+        # A worker that never reached MySQL retries on each probe instead of waiting for traffic
+        warm_up(current_app._get_current_object())
+    if not worker_state['ready']:
+        message = "Database unavailable" if worker_state['error'] else "Worker is warming up"
+        return create_response(False, worker_state, message, status_code=503)
+    return create_response(True, worker_state, "Worker is ready")
+
+@api.route('/api/metrics/database', methods=['GET'])
+def database_metrics():
+    """Replica health, replication lag and read-your-writes pins"""
+    return create_response(True, current_app.extensions['db_router'].snapshot())
+
+@api.route('/api/metrics/group-commit', methods=['GET'])
+def group_commit_metrics():
+    """Batches committed by this worker's group-commit writer"""
+    return create_response(True, current_app.extensions['group_commit_writer'].snapshot())
+
+@api.route('/api/metrics/admission', methods=['GET'])
+def admission_metrics():
+    """Admitted and shed request counts per endpoint class"""
+    return create_response(True, current_app.extensions['admission_controller'].snapshot())
+
 # Error handlers
-@app.errorhandler(404)
+@api.app_errorhandler(404)
 def not_found(error):
     return create_response(False, message="Endpoint not found", status_code=404)
 
-@app.errorhandler(500)
+@api.app_errorhandler(500)
 def internal_error(error):
     return create_response(False, message="Internal server error", status_code=500)
 
-if __name__ == '__main__':
-    # Create database if it doesn't exist
-    try:
-        temp_config = DB_CONFIG.copy()
-        temp_config.pop('database')
-        temp_connection = mysql.connector.connect(**temp_config)
-        temp_cursor = temp_connection.cursor()
-        temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {DB_CONFIG['database']}")
-        temp_connection.commit()
-        temp_cursor.close()
-        temp_connection.close()
-        logger.info("Database checked/created successfully")
-    except Exception as e:
-        logger.error(f"Database creation error: {e}")
+def create_app(config=None, warm=True):
+    """Application factory; builds per-process pools and admission state, then warms up"""
+    started = time.monotonic()
+    app = Flask(__name__)
+    app.extensions['started_at'] = started
+    CORS(app, expose_headers=[READ_YOUR_WRITES_HEADER])
+    
+    app.config.update(DEFAULT_CONFIG)
+    app.config.update(config or {})
+    if app.config['MAX_IN_FLIGHT'] is None:
+        app.config['MAX_IN_FLIGHT'] = app.config['DB_POOL_SIZE']
+    
+    app.extensions['db_router'] = DatabaseRouter(
+        app.config.get('DB_CONFIG', DB_CONFIG),
+        app.config.get('DB_REPLICAS', DB_REPLICAS),
+        app.config['DB_POOL_SIZE']
+    )
+    app.extensions['admission_controller'] = AdmissionController(app.config)
+    app.extensions['category_cache'] = CategoryCache()
+    app.extensions['group_commit_writer'] = GroupCommitWriter(
+        app.config.get('DB_CONFIG', DB_CONFIG),
+        app.config['GROUP_COMMIT_MAX_BATCH'],
+        app.config['GROUP_COMMIT_WINDOW_US']
+    )
+    app.extensions['worker_state'] = {
+        'pid': os.getpid(),
+        'ready': False,
+        'error': None,  # Why the last warm-up could not reach MySQL
+        'startup_ms': None,
+        'warmup_ms': None
+    }
+    
+    app.register_blueprint(api)
+    if warm:
+        warm_up(app)
+    return app
+
+def warm_up(app):
+    """Open DB pools and prepare hot statements before the worker accepts traffic"""
+    worker_state = app.extensions['worker_state']
+    warmup_started = time.monotonic()
+    with app.app_context():
+        try:
+            router = app.extensions['db_router']
+            router.warm_up()
+            connections = router.checkout_all()
+            try:
+                for connection in connections:
+                    warm_prepared_statements(connection)
+                if connections:
+                    # Loads the shared global categories
+                    app.extensions['category_cache'].get(connections[0], 0)
+            finally:
+                for connection in connections:
+                    release_connection(connection)
+        except Error as e:
+            # Stay unready; /api/ready retries the warm-up and pools are also opened lazily
+            logger.error(f"Database warm-up failed: {e}")
+            worker_state['error'] = str(e)
+            return
+    
+    now = time.monotonic()
+    worker_state['warmup_ms'] = round((now - warmup_started) * 1000, 1)
+    worker_state['startup_ms'] = round((now - app.extensions['started_at']) * 1000, 1)
+    worker_state['error'] = None
+    worker_state['ready'] = True
+    logger.info(f"Worker {worker_state['pid']} ready in {worker_state['startup_ms']} ms "
+                f"(warm-up {worker_state['warmup_ms']} ms)")
+
+def migrate_database(db_config):
+    """Create the database if needed, then apply schema.sql and pending migrations"""
+    server_config = db_config.copy()
+    database = server_config.pop('database')
+    connection = mysql.connector.connect(**server_config)
+    cursor = connection.cursor()
+    
+    cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{database}`")
+    cursor.execute(f"USE `{database}`")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        name VARCHAR(255) PRIMARY KEY,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    cursor.execute("SELECT name FROM schema_migrations")
+    applied = {row[0] for row in cursor.fetchall()}
+    
+    pending = []
+    if 'schema.sql' not in applied:
+        cursor.execute("SHOW TABLES LIKE 'users'")
+        if cursor.fetchone():
+            # Database was bootstrapped by setup.sh; only record it
+            cursor.execute("INSERT INTO schema_migrations (name) VALUES ('schema.sql')")
+            connection.commit()
+        else:
+            pending.append(('schema.sql', SCHEMA_PATH))
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if os.path.isdir(MIGRATIONS_DIR):
+        for name in sorted(os.listdir(MIGRATIONS_DIR)):
+            if name.endswith('.sql') and name not in applied:
+                pending.append((name, os.path.join(MIGRATIONS_DIR, name)))
+    
+    for name, path in pending:
+        with open(path) as f:
+            for _ in cursor.execute(f.read(), multi=True):
+                pass
+        cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (name,))
+        connection.commit()
+        logger.info(f"Applied {name}")
+    
+    cursor.close()
+    connection.close()
+    logger.info(f"Database '{database}' is up to date ({len(pending)} scripts applied)")
+
+def serve(bind, workers, threads, config=None):
+    """Run under gunicorn with prefork workers; each builds and warms its own app after fork"""
+    from gunicorn.app.base import BaseApplication
+    
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', bind)
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', False)
+        
+        def load(self):
+            return create_app(config)
+    
+    ProductionServer().run()
+
+def max_workers(config, group_commit=False):
+    """Workers whose pools, plus the group commit connection, fit the MySQL connection budget"""
+    per_worker = config['DB_POOL_SIZE'] + (1 if group_commit else 0)
+    return max(1, config['DB_MAX_CONNECTIONS'] // per_worker)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Spend Tracker backend")
+    commands = parser.add_subparsers(dest='command')
+    commands.add_parser('dev', help="Run the Flask development server (default)")
+    commands.add_parser('migrate', help="Create the database and apply schema migrations")
+    serve_parser = commands.add_parser('serve', help="Run the production server")
+    serve_parser.add_argument('--bind', default='0.0.0.0:5000')
+    serve_parser.add_argument('--workers', type=int,
+                              help="Defaults to 2 * CPUs + 1, capped by DB_MAX_CONNECTIONS")
+    serve_parser.add_argument('--threads', type=int, default=DEFAULT_CONFIG['DB_POOL_SIZE'],
+                              help="Threads per worker; keep at or below DB_POOL_SIZE")
+    serve_parser.add_argument('--group-commit', action='store_true',
+                              help="Batch concurrent transaction inserts into shared commits")
+    args = parser.parse_args(argv)
+    
+    if args.command == 'migrate':
+        migrate_database(DB_CONFIG)
+    elif args.command == 'serve':
+        budget = max_workers(DEFAULT_CONFIG, args.group_commit)
+        if args.workers is None:
+            args.workers = min((os.cpu_count() or 1) * 2 + 1, budget)
+        elif args.workers > budget:
+            serve_parser.error(f"--workers {args.workers} would open more than DB_MAX_CONNECTIONS="
+                         f"{DEFAULT_CONFIG['DB_MAX_CONNECTIONS']} connections; use at most {budget}")
+        serve(args.bind, args.workers, args.threads, {'GROUP_COMMIT': args.group_commit})
+    else:
+        # Only the reloader's child process serves requests
+        app = create_app(warm=os.environ.get('WERKZEUG_RUN_MAIN') == 'true')
+        app.run(debug=True, host='0.0.0.0', port=5000)
+
+if __name__ == '__main__':
+    main()
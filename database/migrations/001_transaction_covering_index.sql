@@ -0,0 +1,5 @@
+-- Covering index for the filtered COUNT, summary and category spending queries.
+-- Category names are resolved from the application cache, so these queries
+-- no longer join categories and can be answered from this index alone.
+CREATE INDEX idx_user_active_date_amounts
+    ON transactions (user_id, is_active, transaction_date, category_id, credited, debited);
@@ -0,0 +1,13 @@
+-- Per-user change sequence for incremental sync (GET /api/sync/changes).
+-- Every write bumps users.change_seq and stamps the rows it touches with the
+-- new value, so a client cursor only needs the last sequence it has seen.
+ALTER TABLE users
+    ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0;
+
+ALTER TABLE transactions
+    ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0,
+    ADD INDEX idx_user_changes (user_id, change_seq, id);
+
+ALTER TABLE categories
+    ADD COLUMN change_seq BIGINT NOT NULL DEFAULT 0,
+    ADD INDEX idx_category_changes (user_id, change_seq, id);
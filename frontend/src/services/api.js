@@ -2,6 +2,11 @@ import axios from 'axios';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000/api';
 
+// Read-your-writes pin returned by write responses; echoed so reads after a
+// write are served by the primary database whichever backend worker handles them
+const PRIMARY_UNTIL_HEADER = 'X-Primary-Until';
+let primaryUntil = null;
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
@@ -16,6 +21,9 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (primaryUntil) {
+      config.headers[PRIMARY_UNTIL_HEADER] = primaryUntil;
+    }
     return config;
   },
   (error) => {
@@ -26,6 +34,10 @@ api.interceptors.request.use(
 // Response interceptor to handle errors
 api.interceptors.response.use(
   (response) => {
+    const pin = response.headers[PRIMARY_UNTIL_HEADER.toLowerCase()];
+    if (pin) {
+      primaryUntil = pin;
+    }
     return response;
   },
   (error) => {
@@ -61,6 +73,15 @@ export const transactionsAPI = {
   delete: (id) => api.delete(`/transactions/${id}`),
   getSummary: (params = {}) => api.get('/transactions/summary', { params }),
   exportCSV: (params = {}) => api.get('/export/csv', { params }),
+  exportColumnar: (format, params = {}) => api.get(`/export/${format}`, { params, responseType: 'blob' }),
+  importColumnar: (format, formData) => api.post(`/import/${format}`, formData, {
+    headers: { 'Content-Type': 'multipart/form-data' },
+  }),
+};
+
+// Sync API calls
+export const syncAPI = {
+  getChanges: (params = {}) => api.get('/sync/changes', { params }),
 };
 
 // Analytics API calls
@@ -147,6 +147,17 @@ else
     exit 1
 fi
 
+# Apply schema migrations on top of schema.sql
+print_status "Applying database migrations..."
+python app.py migrate
+
+if [ $? -eq 0 ]; then
+    print_success "Database migrations applied!"
+else
+    print_error "Failed to apply database migrations."
+    exit 1
+fi
+
 cd ..
 
 # Setup Frontend